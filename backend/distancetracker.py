@@ -15,51 +15,25 @@ class DistanceTracker:
         self.current_size_pair = size_pair(start_size=None, end_size=None) # Current size pair for the user, updated in real-time as they move through the hallway/room
 
 
-    def set_start_size_pair(self, start_pose: PoseDetector, end_pose: PoseDetector) -> bool:
-        start_size = self.calculate_user_size_relative_to_frame(start_pose)
-        end_size = self.calculate_user_size_relative_to_frame(end_pose)
-
-        # Fail if we cannot calculate the size for either the start or end pose (e.g., if key landmarks are not visible)
-        if start_size is None or end_size is None:
-            return False
-        
+    # The sizes below are paired by capture time before they get here (see FrameSync)
+    def set_start_sizes(self, start_size: float, end_size: float) -> None:
         self.start_size_pair = size_pair(
             start_size=start_size,
             end_size=end_size
         )
 
-        return True
-    
-    def set_end_size_pair(self, start_pose: PoseDetector, end_pose: PoseDetector) -> bool:
-        start_size = self.calculate_user_size_relative_to_frame(start_pose)
-        end_size = self.calculate_user_size_relative_to_frame(end_pose)
-
-        # Fail if we cannot calculate the size for either the start or end pose (e.g., if key landmarks are not visible)
-        if start_size is None or end_size is None:
-            return False
-        
+    def set_end_sizes(self, start_size: float, end_size: float) -> None:
         self.end_size_pair = size_pair(
             start_size=start_size,
             end_size=end_size
         )
 
-        return True
-    
-    def update_current_size_pair(self, start_pose: PoseDetector, end_pose: PoseDetector) -> bool:
-        start_size = self.calculate_user_size_relative_to_frame(start_pose)
-        end_size = self.calculate_user_size_relative_to_frame(end_pose)
-
-        # Fail if we cannot calculate the size for either the start or end pose (e.g., if key landmarks are not visible)
-        if start_size is None or end_size is None:
-            return False
-        
+    def set_current_sizes(self, start_size: float, end_size: float) -> None:
         self.current_size_pair = size_pair(
             start_size=start_size,
             end_size=end_size
         )
 
-        return True
-
     def calculate_user_size_relative_to_frame(self, pose: PoseDetector) -> dict:
         results = pose.get_last_results()
         if not results or not results.pose_landmarks:
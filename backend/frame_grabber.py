@@ -1,14 +1,17 @@
 import cv2
 import threading
 import time
+from frame_sync import CameraClock
 
 class FrameGrabber:
-    def __init__(self, url: str, name: str = "cam"):
+    def __init__(self, url: str, name: str = "cam", latency: float = 0.0):
         self.cap = cv2.VideoCapture(url)
         self.name = name
         self.lock = threading.Lock()
         self.frame = None
         self.ret = False
+        self.clock = CameraClock(latency=latency)
+        self.capture_time = None # estimated capture time of self.frame (time.perf_counter clock)
         self.stopped = False
         self.thread = threading.Thread(target=self._loop, daemon=True)
 
@@ -19,9 +22,14 @@ class FrameGrabber:
     def _loop(self):
         while not self.stopped:
             ret, frame = self.cap.read()  # blocking read
+            # stamp every frame here, the main loop may skip some. Done outside the lock because
+            # the clock occasionally refits (see CameraClock._fit) and readers should not wait on it
+            capture_time = self.clock.correct(time.perf_counter()) if ret else None
             with self.lock:
                 self.ret = ret
                 self.frame = frame
+                if ret:
+                    self.capture_time = capture_time
             # tiny sleep prevents pegging CPU if stream glitches
             time.sleep(0.001)
 
@@ -30,6 +38,10 @@ class FrameGrabber:
             # return a copy/reference; copy if you mutate frames downstream
             return self.ret, self.frame
 
+    def read_latest_stamped(self):
+        with self.lock:
+            return self.ret, self.frame, self.capture_time
+
     def release(self):
         self.stopped = True
         self.thread.join(timeout=1.0)
@@ -0,0 +1,214 @@
+from collections import deque
+import math
+from dataclasses import dataclass
+import numpy as np
+
+@dataclass
+class size_sample:
+    # User size relative to the frame, tagged with the (estimated) time the frame was captured
+    capture_time: float
+    size: float
+
+class CameraClock:
+    """
+    Online estimate of when a camera actually captured each frame.
+
+    We only see when a frame *arrives* on this machine, and arrivals are late by a varying
+    amount (network, decoder) and frames get dropped. A camera captures at a steady rate
+    though, so we find that rate from the periodicity of recent arrivals (a periodogram, which
+    does not care about dropped frames), find the phase where the least-delayed frames land,
+    and snap each arrival back to the latest capture slot before it. Until the rate is found
+    with confidence, arrival times are used as-is.
+
+    The fixed part of the latency cannot be observed from arrival times alone, so it can be
+    supplied per camera.
+    """
+
+    def __init__(self, latency: float = 0.0, history: int = 300, warmup: int = 60, refit_every: int = 30):
+        self.fixed_latency = latency # seconds, configured per camera
+        self.warmup = warmup # arrivals needed before we try to find the frame rate
+        self.refit_every = refit_every # arrivals between re-estimating rate and phase
+        self.margin = 0.25 # fraction of a period a frame may arrive ahead of the estimated phase
+        self.max_stall = 10 # frame periods without a frame before the history is dropped
+        self.min_strength = 4.0 # periodicity (in noise standard deviations) needed to trust the rate
+        self.coarse_samples = 64 # newest arrivals the broad period search starts from
+        self.keep_peaks = 8 # candidates kept between refinement steps of the broad search
+        self.run_length = 9 # candidates tried around each kept one (or around the known period)
+
+        self.arrivals = deque(maxlen=history)
+        self.since_fit = 0
+        self.interval = None # median seconds between arrivals, a rough period while not locked
+        self.period = None # estimated seconds between captured frames
+        self.phase = None # time of a capture slot of the least-delayed frames, None until locked
+        self.last_capture = None
+
+    def correct(self, arrival: float) -> float:
+        spacing = self.period or self.interval
+        if self.arrivals and spacing and arrival - self.arrivals[-1] > self.max_stall * spacing:
+            # The stream stalled, arrivals from before it say nothing about the current phase
+            self.arrivals.clear()
+            self.phase = None
+        if not self.arrivals or not spacing or arrival - self.arrivals[-1] > self.margin * spacing:
+            # Frames arriving bunched together (e.g. a backlog flushing after a stall) carry no phase information
+            self.arrivals.append(arrival)
+
+        self.since_fit += 1
+        if len(self.arrivals) >= self.warmup and self.since_fit >= self.refit_every:
+            self._fit()
+            self.since_fit = 0
+
+        capture = arrival
+        if self.phase is not None:
+            # Snap back to the latest capture slot, a frame cannot have been captured after it arrived
+            slot = self.phase + math.floor((arrival - self.phase) / self.period + self.margin) * self.period
+            if slot > self.last_capture:
+                capture = min(slot, arrival)
+
+        self.last_capture = capture
+        return capture - self.fixed_latency
+
+    def _fit(self) -> None:
+        times = np.asarray(self.arrivals) - self.arrivals[0]
+        if times[-1] <= 0:
+            return
+
+        self.interval = float(np.median(np.diff(times)))
+        if self.interval <= 0:
+            return # mostly a backlog arriving at once, wait for live frames
+        if self.period is None:
+            candidates, strength, step = self._search(times)
+        else:
+            # Track the known period: a few candidates around it, resolved over the full history
+            step = self._resolution(times)
+            candidates = self._runs(np.array([self.period]), step)
+            strength = self._strength(times, candidates)
+
+        best = int(np.argmax(strength))
+        if strength[best] < self.min_strength * np.sqrt(len(times)):
+            # Not clearly periodic (too much jitter for this much history), don't correct
+            self.period = None
+            self.phase = None
+            return
+
+        # Refine within the peak's run of candidates with a parabola through the peak
+        period = candidates[best]
+        if 0 < best % self.run_length < self.run_length - 1:
+            y0, y1, y2 = strength[best - 1:best + 2]
+            if y0 - 2 * y1 + y2 != 0:
+                period += 0.5 * (y0 - y2) / (y0 - 2 * y1 + y2) * step
+        self.period = float(period)
+
+        # Most frames arrive with little extra delay, so no other half period of arrival phases is as
+        # crowded as the one starting at the least-delayed frames. Measured from the newest arrival
+        # so a small period error is not extrapolated far.
+        residuals = np.sort((times - times[-1]) % self.period)
+        wrapped = np.concatenate([residuals, residuals + self.period])
+        counts = np.searchsorted(wrapped, residuals + 0.5 * self.period, side="right") - np.arange(len(residuals))
+        self.phase = float(self.arrivals[-1] + residuals[int(np.argmax(counts))])
+
+    def _resolution(self, times: np.ndarray) -> float:
+        # Periods closer than this cannot be told apart over this much history
+        return (self.period or self.interval) ** 2 / (4 * (times[-1] - times[0]))
+
+    def _strength(self, times: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        # How strongly the arrivals repeat at each candidate period (periodogram)
+        return np.abs(np.exp(2j * np.pi * times[None, :] / candidates[:, None]).sum(axis=1))
+
+    def _search(self, times: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+        """
+        Broad search for the period around the typical interval (dropped frames only make it longer).
+
+        Resolving the period over the full history directly would need a candidate count that grows
+        with the history, times the history itself. Instead start with the newest coarse_samples
+        arrivals (about 2 * coarse_samples candidates), keep the strongest few, and double the
+        history while narrowing around them. With the defaults this is roughly 60k complex
+        exponentials per unlocked refit, a few ms on the capture thread once a second.
+        """
+        samples = min(self.coarse_samples, len(times))
+        step = self._resolution(times[-samples:])
+        candidates = np.arange(0.75 * self.interval, 1.25 * self.interval, step)
+        strength = self._strength(times[-samples:], candidates)
+
+        while True:
+            keep = candidates[np.argsort(strength)[-self.keep_peaks:]]
+            samples = min(2 * samples, len(times))
+            step = self._resolution(times[-samples:])
+            candidates = self._runs(keep, step)
+            strength = self._strength(times[-samples:], candidates)
+            if samples == len(times):
+                return candidates, strength, step
+
+    def _runs(self, centers: np.ndarray, step: float) -> np.ndarray:
+        # run_length evenly spaced candidates around each center, one run after another
+        offsets = step * (np.arange(self.run_length) - self.run_length // 2)
+        return (centers[:, None] + offsets[None, :]).ravel()
+
+class FrameSync:
+    """
+    Pairs per-camera measurements by capture time instead of by arrival order.
+
+    Each camera keeps a short history of timestamped sizes. A pair is formed at the newest
+    time both cameras have covered; the camera that produced that frame contributes its
+    sample directly and the other camera's size is interpolated between its neighbouring
+    samples, so mismatched frame rates and latencies do not skew the fused estimate.
+
+    Not thread safe, only the LapTracker.run loop adds samples and asks for pairs.
+    """
+
+    def __init__(self, history: int = 30, max_gap: float = 0.25):
+        self.max_gap = max_gap # seconds, never interpolate across (or extrapolate beyond) more than this
+        self.start_history = deque(maxlen=history)
+        self.end_history = deque(maxlen=history)
+
+    def add_start(self, capture_time: float, size: float) -> None:
+        self._add(self.start_history, capture_time, size)
+
+    def add_end(self, capture_time: float, size: float) -> None:
+        self._add(self.end_history, capture_time, size)
+
+    def _add(self, history: deque, capture_time: float, size: float) -> None:
+        # Ignore out-of-order or duplicate frames so the history stays sorted by time
+        if history and capture_time <= history[-1].capture_time:
+            return
+        history.append(size_sample(capture_time=capture_time, size=size))
+
+    def pair(self, now: float) -> tuple[float, float, float] | None:
+        # Returns (capture_time, start_size, end_size) for the newest time covered by both cameras.
+        # `now` is the capture time of the newest frame from either camera, whether or not the user
+        # was found in it, so a pair goes stale once the user has left the views.
+        if not self.start_history or not self.end_history:
+            return None
+
+        pair_time = min(self.start_history[-1].capture_time, self.end_history[-1].capture_time)
+        if now - pair_time > self.max_gap:
+            return None
+        start_size = self._size_at(self.start_history, pair_time)
+        end_size = self._size_at(self.end_history, pair_time)
+
+        if start_size is None or end_size is None:
+            return None
+
+        return pair_time, start_size, end_size
+
+    def _size_at(self, history: deque, t: float) -> float | None:
+        after = None
+        for sample in reversed(history):
+            if sample.capture_time <= t:
+                before = sample
+                break
+            after = sample
+        else:
+            # Every sample is newer than t, only usable if the oldest one is close enough
+            return after.size if after.capture_time - t <= self.max_gap else None
+
+        if after is None or before.capture_time == t:
+            return before.size if t - before.capture_time <= self.max_gap else None
+
+        gap = after.capture_time - before.capture_time
+        if gap > self.max_gap:
+            # Too far apart to interpolate (e.g. landmarks lost), fall back to the nearest sample
+            nearest = before if t - before.capture_time <= after.capture_time - t else after
+            return nearest.size if abs(nearest.capture_time - t) <= self.max_gap else None
+
+        weight = (t - before.capture_time) / gap
+        return before.size + weight * (after.size - before.size)
\ No newline at end of file
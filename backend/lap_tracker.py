@@ -5,7 +5,9 @@ from distancetracker import DistanceTracker
 from lap_state import LapState
 import numpy as np
 import threading
+import time
 from frame_grabber import FrameGrabber
+from frame_sync import FrameSync
 
 class LapTracker:
     def __init__(self, rotate_frames=True, threshold=0.14, display_windows=True):
@@ -15,14 +17,22 @@ class LapTracker:
         url_end = dotenv_values().get("URL_END")
         print(f"URL_START: {url_start}, URL_END: {url_end}")
 
+        # optional fixed per-camera latency in milliseconds (the part that cannot be estimated online)
+        latency_start = float(dotenv_values().get("LATENCY_START_MS") or 0) / 1000
+        latency_end = float(dotenv_values().get("LATENCY_END_MS") or 0) / 1000
+
         # threaded grabbers (instead of direct cap.read in the loop)
-        self.start_cam = FrameGrabber(url_start, "start").start()
-        self.end_cam = FrameGrabber(url_end, "end").start()
+        self.start_cam = FrameGrabber(url_start, "start", latency=latency_start).start()
+        self.end_cam = FrameGrabber(url_end, "end", latency=latency_end).start()
 
         self.pd_start = PoseDetector(min_detection_confidence=0.5, min_tracking_confidence=0.5)
         self.pd_end = PoseDetector(min_detection_confidence=0.5, min_tracking_confidence=0.5)
 
         self.distance_tracker = DistanceTracker()
+        self.frame_sync = FrameSync(history=30, max_gap=0.25)
+        self.last_start_time = None
+        self.last_end_time = None
+        self.pending_calibration = None # (update_method, pair_name) from a key press, applied on the next frame
 
         self._state_lock = threading.Lock()
         self.laps = 0
@@ -34,29 +44,47 @@ class LapTracker:
 
         self.display_windows = display_windows
 
-    def update_tracker_pair(self, update_method, pair_name):
-        if update_method(self.pd_start, self.pd_end):
+    def update_tracker_pair(self, update_method, pair_name, synced_pair):
+        # calibrate from sizes paired by capture time, like the current size pair
+        if synced_pair is not None:
+            _, start_size, end_size = synced_pair
+            update_method(start_size, end_size)
             print(f"{pair_name} updated successfully.")
         else:
             print(f"Failed to update {pair_name}. Please ensure key landmarks are visible in both cameras.")
 
     def run(self):
         while True:
-            ret_start, frame_start = self.start_cam.read_latest()
-            ret_end, frame_end = self.end_cam.read_latest()
-
-            if ret_start and frame_start is not None:
+            ret_start, frame_start, time_start = self.start_cam.read_latest_stamped()
+            ret_end, frame_end, time_end = self.end_cam.read_latest_stamped()
+            new_frame = False
+            new_sample = False
+
+            # only process frames we have not seen yet, re-processing a frame would add a duplicate sample
+            if ret_start and frame_start is not None and time_start != self.last_start_time:
+                self.last_start_time = time_start
+                new_frame = True
                 if self.rotate_frames:
                     frame_start = cv2.rotate(frame_start, cv2.ROTATE_90_CLOCKWISE)
                 self.pd_start.process(frame_start)
+                start_size = self.distance_tracker.calculate_user_size_relative_to_frame(self.pd_start)
+                if start_size is not None:
+                    self.frame_sync.add_start(time_start, start_size)
+                    new_sample = True
                 if self.display_windows:
                     out_start = self.pd_start.overlay_pose(np.zeros_like(frame_start))
                     cv2.imshow("Camera Start", out_start)
 
-            if ret_end and frame_end is not None:
+            if ret_end and frame_end is not None and time_end != self.last_end_time:
+                self.last_end_time = time_end
+                new_frame = True
                 if self.rotate_frames:
                     frame_end = cv2.rotate(frame_end, cv2.ROTATE_90_CLOCKWISE)
                 self.pd_end.process(frame_end)
+                end_size = self.distance_tracker.calculate_user_size_relative_to_frame(self.pd_end)
+                if end_size is not None:
+                    self.frame_sync.add_end(time_end, end_size)
+                    new_sample = True
                 out_end = self.pd_end.overlay_pose(np.zeros_like(frame_end))
                 cv2.imshow("Camera End", out_end)
 
@@ -65,16 +93,33 @@ class LapTracker:
                 if key == 27:
                     break
                 if key == ord('s'):
-                    self.update_tracker_pair(self.distance_tracker.set_start_size_pair, "Start size pair by key press")
+                    self.pending_calibration = (self.distance_tracker.set_start_sizes, "Start size pair by key press")
                 if key == ord('e'):
-                    self.update_tracker_pair(self.distance_tracker.set_end_size_pair, "End size pair by key press")
+                    self.pending_calibration = (self.distance_tracker.set_end_sizes, "End size pair by key press")
+
+            if not new_frame:
+                # neither camera has a new frame yet, nothing below would change
+                time.sleep(0.001)
+                continue
+
+            # pair the cameras by capture time rather than by whichever frames happened to be latest,
+            # "now" being the newest frame either camera has given us
+            now = max(t for t in (self.last_start_time, self.last_end_time) if t is not None)
+            synced_pair = self.frame_sync.pair(now)
+            # only calibrate from a pair that includes the user as just seen
+            calibration_pair = synced_pair if new_sample else None
 
             if self.pd_end.left_hand_raised() and self.pd_start.left_hand_raised():
-                self.update_tracker_pair(self.distance_tracker.set_start_size_pair, "Start size pair by left hand raise")
+                self.update_tracker_pair(self.distance_tracker.set_start_sizes, "Start size pair by left hand raise", calibration_pair)
             if self.pd_end.right_hand_raised() and self.pd_start.right_hand_raised():
-                self.update_tracker_pair(self.distance_tracker.set_end_size_pair, "End size pair by right hand raise")
-
-            self.distance_tracker.update_current_size_pair(self.pd_start, self.pd_end)
+                self.update_tracker_pair(self.distance_tracker.set_end_sizes, "End size pair by right hand raise", calibration_pair)
+            if self.pending_calibration is not None:
+                self.update_tracker_pair(*self.pending_calibration, calibration_pair)
+                self.pending_calibration = None
+
+            if synced_pair is not None:
+                _, start_size, end_size = synced_pair
+                self.distance_tracker.set_current_sizes(start_size, end_size)
 
             progress = self.distance_tracker.estimate_progress()
             if progress is not None:
@@ -0,0 +1,124 @@
+import math
+import random
+
+from frame_sync import CameraClock, FrameSync
+
+
+# Sanity checks for frame_sync.py against simulated cameras (no cameras or mediapipe needed):
+#   python simulated_frame_sync.py
+
+
+# --- Simulated camera --------------------------------------------------------
+
+def simulate_arrivals(fps=30.0, base_delay=0.05, jitter=0.02, drop=0.0, seconds=100.0, stall_at=None, seed=0):
+    """
+    Returns (capture_time, arrival_time) for each frame that reaches us.
+
+    Every frame is late by base_delay plus an exponentially distributed extra delay
+    (mean `jitter`), a fraction `drop` of frames never arrives, and with `stall_at`
+    the stream freezes for a second and then flushes its backlog all at once.
+    """
+    rng = random.Random(seed)
+    frames = []
+    for i in range(int(seconds * fps)):
+        if rng.random() < drop:
+            continue
+        capture = i / fps
+        arrival = capture + base_delay + rng.expovariate(1 / jitter)
+        if stall_at is not None and stall_at <= capture < stall_at + 1.0:
+            arrival = max(arrival, stall_at + 1.0 + base_delay)
+        frames.append((capture, arrival))
+    return frames
+
+
+def rms(values):
+    return math.sqrt(sum(v * v for v in values) / len(values))
+
+
+# --- CameraClock -------------------------------------------------------------
+
+def check_camera_clock() -> None:
+    base_delay = 0.05
+    for jitter in (0.002, 0.01, 0.02):
+        for drop in (0.0, 0.1, 0.3):
+            for stall_at in (None, 50.0):
+                clock = CameraClock(latency=base_delay)
+                frames = simulate_arrivals(base_delay=base_delay, jitter=jitter, drop=drop, stall_at=stall_at)
+                estimated = [clock.correct(arrival) - capture for capture, arrival in frames]
+                raw = [arrival - base_delay - capture for capture, arrival in frames]
+
+                print(
+                    f"jitter {jitter * 1000:4.0f} ms, drop {drop:.0%}, stall {stall_at is not None!s:5}: "
+                    f"rms error {rms(estimated) * 1000:5.1f} ms (raw {rms(raw) * 1000:5.1f} ms), "
+                    f"earliest {min(estimated) * 1000:6.1f} ms"
+                )
+
+                # Correcting must never make timestamps worse than just using arrival times...
+                assert rms(estimated) <= rms(raw), "corrected timestamps are worse than raw arrivals"
+                # ...and must never claim a frame was captured well before it actually was
+                assert min(estimated) > -0.25 / 30, "a frame was stamped before it was captured"
+
+    # With a stable stream the jitter should be almost entirely removed, dropped frames or not
+    for drop in (0.0, 0.3):
+        clock = CameraClock(latency=base_delay)
+        frames = simulate_arrivals(base_delay=base_delay, jitter=0.002, drop=drop)
+        estimated = [clock.correct(arrival) - capture for capture, arrival in frames]
+        assert rms(estimated[300:]) < 0.001, "jitter was not removed on a stable stream"
+
+
+# --- FrameSync ---------------------------------------------------------------
+
+def check_frame_sync() -> None:
+    # Walking towards the end camera: size grows linearly with time in both views
+    start_size = lambda t: 0.2 + 0.01 * t
+    end_size = lambda t: 0.8 - 0.02 * t
+
+    # Mismatched frame rates: pairs are taken at a common time, interpolating the slower camera
+    sync = FrameSync(max_gap=0.25)
+    for i in range(30):
+        sync.add_start(i / 30, start_size(i / 30))
+    for i in range(15):
+        t = i / 15 + 0.01
+        sync.add_end(t, end_size(t))
+    pair_time, start, end = sync.pair(now=29 / 30)
+    assert math.isclose(start, start_size(pair_time)) and math.isclose(end, end_size(pair_time)), "pair is not time aligned"
+
+    # Once the user has left both views, frames keep coming but the last pair must not be reused
+    assert sync.pair(now=29 / 30 + 1.0) is None, "returned a stale pair"
+
+    # A camera that lost the person for longer than max_gap is not interpolated across
+    sync = FrameSync(max_gap=0.25)
+    sync.add_end(0.0, end_size(0.0))
+    sync.add_end(1.0, end_size(1.0))
+    sync.add_start(0.5, start_size(0.5))
+    assert sync.pair(now=1.0) is None, "interpolated across a gap longer than max_gap"
+
+    # End to end: the end camera runs at half the rate and 100 ms further behind (configured)
+    start_clock, end_clock = CameraClock(latency=0.03), CameraClock(latency=0.13)
+    frames = [(arrival, "start", capture) for capture, arrival in simulate_arrivals(30, 0.03, 0.005, 0.1, 60, seed=1)]
+    frames += [(arrival, "end", capture) for capture, arrival in simulate_arrivals(15, 0.13, 0.005, 0.1, 60, seed=2)]
+    sync = FrameSync(max_gap=0.25)
+    synced, naive, latest, stamped = [], [], {}, {}
+    for arrival, camera, capture in sorted(frames):
+        if camera == "start":
+            stamped[camera] = start_clock.correct(arrival)
+            sync.add_start(stamped[camera], start_size(capture))
+        else:
+            stamped[camera] = end_clock.correct(arrival)
+            sync.add_end(stamped[camera], end_size(capture))
+        latest[camera] = capture
+        pair = sync.pair(now=max(stamped.values()))
+        if pair is not None and len(latest) == 2:
+            _, start, end = pair
+            # How far apart in time the two paired sizes really are
+            synced.append((start - 0.2) / 0.01 - (0.8 - end) / 0.02)
+            naive.append(latest["start"] - latest["end"])
+
+    print(f"pair time mismatch: synced {rms(synced) * 1000:.1f} ms, latest frames {rms(naive) * 1000:.1f} ms")
+    assert rms(synced) < rms(naive) / 5, "synced pairs are not closer in time than the latest frames"
+
+
+if __name__ == "__main__":
+    check_camera_clock()
+    check_frame_sync()
+    print("All frame sync checks passed.")